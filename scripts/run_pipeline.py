@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 import argparse
+import copy
+import shutil
 import sys
 from pathlib import Path
-from typing import List
+from typing import Any, Dict, List
 
 
 def _add_src_to_path() -> None:
@@ -20,6 +22,7 @@ def _add_src_to_path() -> None:
 
 _add_src_to_path()
 
+from paper_analysis.scheduler import build_dag, import_step, run_dag  # noqa: E402
 from paper_analysis.utils import ensure_dir, load_yaml  # noqa: E402
 
 
@@ -46,9 +49,67 @@ def parse_args() -> argparse.Namespace:
     # Convenience ablation switches
     p.add_argument("--use-ablation", action="store_true", help="Use parameters.ablation.output_csv as scalars source and write histograms to a separate folder")
     p.add_argument("--ablation-tag", type=str, default="ablation", help="Suffix/tag for histogram output folder when --use-ablation is set")
+    # Checkpointing
+    p.add_argument("--checkpoint", action="store_true", help="Write per-session partial outputs so an interrupted run can be resumed")
+    p.add_argument("--resume", action="store_true", help="Reuse partial outputs from an interrupted checkpointed run (implies --checkpoint)")
+    # Parallel scheduling
+    p.add_argument("--jobs", type=int, default=None, help="Max steps to run concurrently (default: config.analysis.jobs or 1)")
+    p.add_argument("--log-dir", type=str, default=None, help="Per-step log folder when --jobs > 1 (default: <results_dir>/logs)")
     return p.parse_args()
 
 
+def _ablation_cfg(cfg: Dict[str, Any], ablation_tag: str) -> Dict[str, Any]:
+    """Copy of cfg that reads the ablation output and writes histograms to a tagged folder."""
+    out = copy.deepcopy(cfg)
+    ab = out.get("parameters", {}).get("ablation", {})
+    # Point scalars_csv to the file step_replace_syllables actually writes
+    mod, _ = import_step("replace_syllables")
+    resolved = mod.ablation_paths(out) if mod is not None and hasattr(mod, "ablation_paths") else None
+    if resolved is not None:
+        out.setdefault("paths", {})["scalars_csv"] = str(resolved[1])
+    elif ab.get("output_csv"):
+        out.setdefault("paths", {})["scalars_csv"] = ab["output_csv"]
+    # Choose a meaningful suffix for histogram_dir
+    excl = ab.get("exclude_syllables", []) or []
+    if ablation_tag and ablation_tag != "ablation":
+        suffix = ablation_tag
+    else:
+        # Default: reflect replaced syllables like the ablation CSV
+        excl_str = ",".join(str(x) for x in sorted(excl))
+        suffix = f"replace_syll_[{excl_str}]" if excl_str else "ablation"
+    base_hist = Path(out.get("paths", {}).get("histogram_dir", "results/scalar_histograms"))
+    out["paths"]["histogram_dir"] = str(base_hist.with_name(base_hist.name + f"_{suffix}"))
+    return out
+
+
+def _resolve_paths(cfg: Dict[str, Any], root: Path) -> None:
+    # Ensure folder structure exists (resolve relative to project root)
+    paths = cfg.get("paths", {})
+    for key in ["results_dir", "figures_dir", "tables_dir", "histogram_dir", "pose_dir", "group_index_csv", "scalars_csv"]:
+        if key in paths and paths[key]:
+            p = Path(paths[key])
+            if not p.is_absolute():
+                p = (root / p).resolve()
+            ensure_dir(p if p.suffix == "" else p.parent)
+            paths[key] = str(p)
+    cfg["paths"] = paths
+
+
+def _remove_checkpoints(nodes: List[Dict[str, Any]]) -> None:
+    # Checkpoint folders are kept while any step may still be resumed; drop them once
+    # every requested step has finished.
+    work_dirs = set()
+    for node in nodes:
+        paths = node["cfg"].get("paths", {})
+        results_dir = Path(paths.get("results_dir", "results"))
+        work_dirs.add(results_dir / ".work")
+        work_dirs.add(Path(paths.get("histogram_dir", results_dir / "scalar_histograms")) / ".work")
+    for d in sorted(work_dirs):
+        if d.is_dir():
+            shutil.rmtree(d, ignore_errors=True)
+            print(f"Removed checkpoint folder {d}")
+
+
 def main() -> None:
     args = parse_args()
     cfg = load_yaml(args.config)
@@ -65,69 +126,83 @@ def main() -> None:
     if args.figures_dir:
         paths["figures_dir"] = args.figures_dir
     cfg["paths"] = paths
+    analysis = cfg.setdefault("analysis", {}) or {}
+    if args.checkpoint or args.resume:
+        analysis["checkpoint"] = True
+    analysis["resume"] = bool(args.resume)
+    cfg["analysis"] = analysis
 
     default_steps: List[str] = cfg.get("analysis", {}).get("steps", ["preprocess", "analyze", "plot"])  # type: ignore
     steps: List[str] = args.steps if args.steps else default_steps
+    jobs = int(args.jobs if args.jobs is not None else cfg.get("analysis", {}).get("jobs", 1) or 1)
 
     print(f"Using config: {args.config}")
     print(f"Steps: {steps}")
 
-    # If requested, configure ablation-derived inputs/outputs
+    # `step@ablation` runs a step against the ablation-derived inputs/outputs;
+    # --use-ablation applies that to every step.
+    # The ablation config is only built (and its folders created) when something uses it.
+    ablation = None
+    if args.use_ablation or any(token.partition("@")[2] == "ablation" for token in steps):
+        ablation = _ablation_cfg(cfg, args.ablation_tag)
     if args.use_ablation:
-        ab = cfg.get("parameters", {}).get("ablation", {})
-        out_csv = ab.get("output_csv")
-        if out_csv:
-            # Point scalars_csv to ablation output
-            cfg.setdefault("paths", {})["scalars_csv"] = out_csv
-        # Choose a meaningful suffix for histogram_dir
-        excl = ab.get("exclude_syllables", []) or []
-        if args.ablation_tag and args.ablation_tag != "ablation":
-            suffix = args.ablation_tag
-        else:
-            # Default: reflect replaced syllables like the ablation CSV
-            excl_str = ",".join(str(x) for x in sorted(excl))
-            suffix = f"replace_syll_[{excl_str}]" if excl_str else "ablation"
-        base_hist = cfg.get("paths", {}).get("histogram_dir", "results/scalar_histograms")
-        from pathlib import Path as _P
-        base_hist_p = _P(base_hist)
-        tagged = base_hist_p.with_name(base_hist_p.name + f"_{suffix}")
-        cfg["paths"]["histogram_dir"] = str(tagged)
+        cfg = ablation
 
-    # Ensure folder structure exists (resolve relative to project root)
     root = Path(__file__).resolve().parents[1]
-    paths = cfg.get("paths", {})
-    for key in ["results_dir", "figures_dir", "tables_dir", "histogram_dir", "pose_dir", "group_index_csv", "scalars_csv"]:
-        if key in paths and paths[key]:
-            p = Path(paths[key])
-            if not p.is_absolute():
-                p = (root / p).resolve()
-            ensure_dir(p if p.suffix == "" else p.parent)
-            paths[key] = str(p)
-    cfg["paths"] = paths
-
-    # Lazy import step modules
-    from importlib import import_module
-
-    for step in steps:
-        mod = None
-        errors = []
-        for mod_name in (f"scripts.step_{step}", f"step_{step}"):
-            try:
-                mod = import_module(mod_name)
-                break
-            except ModuleNotFoundError as e:
-                errors.append(str(e))
+    _resolve_paths(cfg, root)
+    if ablation is not None and ablation is not cfg:
+        _resolve_paths(ablation, root)
+
+    nodes: List[Dict[str, Any]] = []
+    for token in steps:
+        step, _, variant = token.partition("@")
+        if variant not in ("", "ablation"):
+            print(f"[WARN] Unknown variant '{variant}' for step '{step}'. Use '{step}' or '{step}@ablation'.")
+            continue
+        if any(n["id"] == token for n in nodes):
+            print(f"[WARN] Step '{token}' listed more than once; running it once.")
+            continue
+        mod, errors = import_step(step)
         if mod is None:
             print(f"[WARN] Could not import step '{step}'. Tried: scripts.step_{step}, step_{step}. Errors: {errors}")
             continue
 
         if not hasattr(mod, "run"):
-            print(f"[WARN] Step module '{mod_name}' missing a 'run(cfg)' function")
+            print(f"[WARN] Step module '{mod.__name__}' missing a 'run(cfg)' function")
             continue
 
-        print(f"\n==> Running step: {step}")
-        mod.run(cfg)
-
+        node_cfg = ablation if variant == "ablation" else cfg
+        node: Dict[str, Any] = {"id": token, "step": step, "module": mod, "cfg": node_cfg}
+        if hasattr(mod, "artifacts"):
+            consumes, produces = mod.artifacts(node_cfg)
+            node.update(consumes=consumes, produces=produces)
+        else:
+            # Undeclared inputs/outputs: keep list order around this step
+            node["barrier"] = True
+        nodes.append(node)
+
+    if jobs <= 1:
+        for node in nodes:
+            print(f"\n==> Running step: {node['id']}")
+            node["module"].run(node["cfg"])
+    else:
+        deps = build_dag(nodes)
+        for node in nodes:
+            after = sorted(deps[node["id"]])
+            print(f"  {node['id']}" + (f" <- {after}" if after else ""))
+        log_dir = Path(args.log_dir) if args.log_dir else Path(cfg["paths"].get("results_dir", root / "results")) / "logs"
+        if not log_dir.is_absolute():
+            log_dir = (root / log_dir).resolve()
+        print(f"\nRunning with jobs={jobs}, logs in {log_dir}")
+        run_dag(
+            [{k: v for k, v in n.items() if k != "module"} for n in nodes],
+            deps,
+            jobs=jobs,
+            log_dir=log_dir,
+        )
+
+    if analysis.get("checkpoint"):
+        _remove_checkpoints(nodes)
     print("\nPipeline complete.")
 
 
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def _add_src_to_path() -> None:
+    import sys
+
+    this = Path(__file__).resolve()
+    root = this.parents[1]
+    src = root / "src"
+    if str(src) not in sys.path:
+        sys.path.insert(0, str(src))
+
+
+_add_src_to_path()
+
+from paper_analysis.utils import ensure_dir, resolve_path  # noqa: E402
+from paper_analysis.features import ANGLE_LIKE_VARIABLES, variable_bin_edges  # noqa: E402
+from paper_analysis.density import fft_kde, folded_angle_kde, kde_bandwidth  # noqa: E402
+
+
+def _io_paths(cfg: Dict[str, Any]) -> Tuple[Path, Path, Path]:
+    paths = cfg.get("paths", {})
+    root = Path(__file__).resolve().parents[1]
+    results_dir = resolve_path(paths.get("results_dir", "results"), root)
+    histogram_dir = resolve_path(paths.get("histogram_dir", results_dir / "scalar_histograms"), root)
+    # Same scalars source as build_histograms (paths.scalars_csv overrides, e.g. ablation output)
+    scalars_csv_cfg = paths.get("scalars_csv")
+    scalars_csv = resolve_path(scalars_csv_cfg, root) if scalars_csv_cfg else results_dir / "scalar_summaries.csv"
+    index_csv = resolve_path(paths.get("group_index_csv", "data/SIT/SIratio.csv"), root)
+    return scalars_csv, index_csv, histogram_dir
+
+
+def artifacts(cfg: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+    scalars_csv, index_csv, histogram_dir = _io_paths(cfg)
+    variables = list(cfg.get("parameters", {}).get("variables", []))
+    produces = [str(histogram_dir / f"{var}_density_data.csv") for var in variables]
+    produces.append(str(histogram_dir / "group_mean_density.csv"))
+    return [str(scalars_csv), str(index_csv)], produces
+
+
+def run(cfg: Dict[str, Any]) -> None:
+    params = cfg.get("parameters", {})
+    scalars_csv, index_csv, histogram_dir_path = _io_paths(cfg)
+
+    if not scalars_csv.exists():
+        print(f"Scalar summary not found: {scalars_csv}")
+        return
+    if not index_csv.exists():
+        print(f"Group index file not found: {index_csv}")
+        return
+    histogram_dir = ensure_dir(histogram_dir_path)
+
+    variables: List[str] = list(params.get("variables", []))
+    bin_method: str = str(params.get("bin_method", "freedman_diaconis")).lower()
+    manual_dist = float(params.get("manual_bin_width_distance_like", 1.0))
+    manual_angle = float(params.get("manual_bin_width_angle_like", 0.5236))
+    variable_bins = params.get("variable_bins", {})
+    n_grid = int(params.get("density_grid_size", 512))
+    bw_method = params.get("density_bw_method", "scott")
+    pad_frac = float(params.get("density_padding", 0.1))
+
+    df = pd.read_csv(scalars_csv)
+    index_df = pd.read_csv(index_csv)
+    if "group" in df.columns:
+        df = df.drop(columns=["group"])  # avoid double merge
+    merged = pd.merge(df, index_df, on="name", how="inner")
+
+    if not variables:
+        variables = [c for c in merged.columns if c not in {"name", "group"}]
+    print(f"[build_densities] scalars_csv={scalars_csv}")
+    print(f"[build_densities] variables={variables}")
+    print(f"[build_densities] grid_size={n_grid}, bw_method={bw_method}")
+
+    mouse_groups = list(merged.groupby("name", sort=True))
+    group_frames: List[pd.DataFrame] = []
+    for var in variables:
+        values = merged[var].to_numpy(dtype=float)
+        finite = values[np.isfinite(values)]
+        # Unsigned angles (abs(arctan2)) live on [0, pi]: smooth them on the circle.
+        circular = var in ANGLE_LIKE_VARIABLES and finite.size > 0 and finite.min() >= 0 and finite.max() <= np.pi + 1e-9
+        if not circular:
+            # Share one grid per variable across mice, spanning the histogram range plus padding
+            edges = variable_bin_edges(
+                values,
+                var,
+                method=bin_method,
+                manual_width_distance=manual_dist,
+                manual_width_angle=manual_angle,
+                variable_bins=variable_bins,
+            )
+            pad = pad_frac * (edges[-1] - edges[0])
+            lo, hi = float(edges[0] - pad), float(edges[-1] + pad)
+
+        frames = []
+        for name, sub in mouse_groups:
+            vals = sub[var].to_numpy(dtype=float)
+            vals = vals[np.isfinite(vals)]
+            if vals.size == 0:
+                continue
+            bw = kde_bandwidth(vals, bw_method)
+            if circular:
+                grid, dens = folded_angle_kde(vals, n_grid, bandwidth=bw)
+            else:
+                grid, dens = fft_kde(vals, lo, hi, n_grid, bandwidth=bw)
+            frames.append(
+                pd.DataFrame(
+                    {
+                        "variable": var,
+                        "group": sub["group"].iloc[0],
+                        "mouse": name,
+                        "x": grid,
+                        "density": dens,
+                    }
+                )
+            )
+        if not frames:
+            continue
+
+        var_df = pd.concat(frames, ignore_index=True)
+        out_csv = Path(histogram_dir) / f"{var}_density_data.csv"
+        var_df.to_csv(out_csv, index=False)
+        group_frames.append(var_df.groupby(["variable", "group", "x"])["density"].mean().reset_index())
+
+    if group_frames:
+        group_mean_out = Path(histogram_dir) / "group_mean_density.csv"
+        pd.concat(group_frames, ignore_index=True).to_csv(group_mean_out, index=False)
+        print(f"Wrote {group_mean_out}")
+    else:
+        print("No density rows produced.")
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import json
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Tuple
 
@@ -19,38 +20,20 @@ def _add_src_to_path() -> None:
 
 _add_src_to_path()
 
-from paper_analysis.utils import ensure_dir  # noqa: E402
-
-
-def _compute_bin_edges(values: np.ndarray, method: str, manual_width: float | None = None) -> np.ndarray:
-    data = values[np.isfinite(values)]
-    if data.size == 0:
-        return np.array([0.0, 1.0])
-    x_min = np.percentile(data, 1)
-    x_max = np.percentile(data, 99)
-    if method == "sturges":
-        n = int(np.ceil(np.log2(max(data.size, 1))) + 1)
-    elif method == "scott":
-        sigma = np.std(data)
-        if sigma == 0:
-            n = 10
-        else:
-            h = 3.5 * sigma * (data.size ** (-1 / 3))
-            n = int(np.ceil((x_max - x_min) / max(h, 1e-6)))
-    elif method == "freedman_diaconis":
-        q75, q25 = np.percentile(data, [75, 25])
-        iqr = q75 - q25
-        if iqr == 0:
-            n = 10
-        else:
-            h = 2 * iqr * (data.size ** (-1 / 3))
-            n = int(np.ceil((x_max - x_min) / max(h, 1e-6)))
-    elif method == "manual" and manual_width:
-        n = int(np.ceil((x_max - x_min) / manual_width))
-    else:
-        n = 10
-    n = max(n, 1)
-    return np.linspace(x_min, x_max, n + 1)
+from paper_analysis.checkpoint import CheckpointDir, file_digest, fingerprint  # noqa: E402
+from paper_analysis.utils import ensure_dir, resolve_path  # noqa: E402
+from paper_analysis.features import variable_bin_edges  # noqa: E402
+
+
+def artifacts(cfg: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+    paths = cfg.get("paths", {})
+    root = Path(__file__).resolve().parents[1]
+    results_dir = resolve_path(paths.get("results_dir", "results"), root)
+    histogram_dir = resolve_path(paths.get("histogram_dir", results_dir / "scalar_histograms"), root)
+    scalars_csv_cfg = paths.get("scalars_csv")
+    scalars_csv = resolve_path(scalars_csv_cfg, root) if scalars_csv_cfg else results_dir / "scalar_summaries.csv"
+    index_csv = resolve_path(paths.get("group_index_csv", "data/SIT/SIratio.csv"), root)
+    return [str(scalars_csv), str(index_csv)], [str(histogram_dir)]
 
 
 def run(cfg: Dict[str, Any]) -> None:
@@ -102,7 +85,6 @@ def run(cfg: Dict[str, Any]) -> None:
         df = df.drop(columns=["group"])  # avoid double merge
     merged = pd.merge(df, index_df, on="name", how="inner")
 
-    groups = merged["group"].unique().tolist()
     if not variables:
         variables = [c for c in merged.columns if c not in {"name", "group"}]
     print(f"[build_histograms] results_dir={results_dir}")
@@ -110,34 +92,78 @@ def run(cfg: Dict[str, Any]) -> None:
     print(f"[build_histograms] variables={variables}")
     print(f"[build_histograms] bin_method={bin_method}")
 
+    analysis = cfg.get("analysis", {})
+    resume = bool(analysis.get("resume", False))
+    ckpt = None
+    if resume or analysis.get("checkpoint", False):
+        # Per-mouse partials in <histogram_dir>/.work, keyed to the input contents and settings
+        # (a byte-identical rewrite of the scalars file by a resumed compute_scalars keeps them)
+        inputs = [(str(q), file_digest(q)) for q in (scalars_csv, index_csv)]
+        ckpt = CheckpointDir(
+            Path(histogram_dir) / ".work",
+            fingerprint({"parameters": params, "variables": variables, "inputs": inputs}),
+            resume=resume,
+        )
+        print(f"[build_histograms] checkpoint={ckpt.path} ({sum(k.startswith('mouse_') for k in ckpt.records)} mice already done)")
+
+    edges_by_var: Dict[str, np.ndarray] = {}
+    if ckpt is not None and ckpt.is_done("bin_edges", ".json"):
+        saved = json.loads(ckpt.part_path("bin_edges", ".json").read_text(encoding="utf-8"))
+        edges_by_var = {var: np.asarray(saved[var], dtype=float) for var in variables}
+    else:
+        for var in variables:
+            edges_by_var[var] = variable_bin_edges(
+                merged[var].to_numpy(),
+                var,
+                method=bin_method,
+                manual_width_distance=manual_dist,
+                manual_width_angle=manual_angle,
+                variable_bins=variable_bins,
+            )
+        if ckpt is not None:
+            ckpt.commit("bin_edges", ".json", json.dumps({var: e.tolist() for var, e in edges_by_var.items()}))
+
+    def _mouse_partial(sub: pd.DataFrame) -> Dict[str, Any]:
+        # Raw counts and summary statistics for one mouse across all variables
+        g = sub["group"].iloc[0]
+        out: Dict[str, Any] = {"group": g.item() if hasattr(g, "item") else g, "variables": {}}
+        for var in variables:
+            hist, _ = np.histogram(sub[var].to_numpy(), bins=edges_by_var[var])
+            vals = sub[var].to_numpy()
+            vals = vals[np.isfinite(vals)]
+            rec: Dict[str, Any] = {"hist": [int(h) for h in hist]}
+            if vals.size > 0:
+                rec.update(
+                    mean=float(np.mean(vals)),
+                    std=float(np.std(vals, ddof=1)) if vals.size > 1 else 0.0,
+                    n=int(vals.size),
+                )
+            out["variables"][var] = rec
+        return out
+
+    partials: Dict[Any, Dict[str, Any]] = {}
+    if ckpt is not None:
+        for i, (name, sub) in enumerate(merged.groupby("name")):
+            key = f"mouse_{i:05d}"
+            if ckpt.is_done(key, ".json", {"name": str(name)}):
+                partials[name] = json.loads(ckpt.part_path(key, ".json").read_text(encoding="utf-8"))
+                continue
+            partials[name] = _mouse_partial(sub)
+            ckpt.commit(key, ".json", json.dumps(partials[name], default=str), {"name": str(name)})
+    else:
+        partials = {name: _mouse_partial(sub) for name, sub in merged.groupby("name")}
+
     all_rows = []
     mouse_averages_rows = []
     for var in variables:
-        values = merged[var].to_numpy()
-        is_angle = var in {"angle_to_origin", "torso_angle"}
-        width = manual_angle if is_angle else manual_dist
-        # Per-variable override: integer => number of bins (1-99 pct range), list => explicit edges
-        vb = variable_bins.get(var)
-        if isinstance(vb, int) and vb > 0:
-            data = values[np.isfinite(values)]
-            if data.size == 0:
-                edges = np.array([0.0, 1.0])
-            else:
-                x_min = np.percentile(data, 1)
-                x_max = np.percentile(data, 99)
-                edges = np.linspace(x_min, x_max, int(vb) + 1)
-        elif isinstance(vb, (list, tuple, np.ndarray)) and len(vb) >= 2:
-            edges = np.asarray(vb, dtype=float)
-        else:
-            edges = _compute_bin_edges(values, bin_method, manual_width=width)
+        edges = edges_by_var[var]
         centers = (edges[:-1] + edges[1:]) / 2
 
-        group_mouse_hist = {g: {} for g in groups}
-        for name, sub in merged.groupby("name"):
-            hist, _ = np.histogram(sub[var].to_numpy(), bins=edges)
+        for name, part in partials.items():
+            g = part["group"]
+            rec = part["variables"][var]
+            hist = np.asarray(rec["hist"])
             norm = hist / max(hist.sum(), 1)
-            g = sub["group"].iloc[0]
-            group_mouse_hist[g][name] = {"bin_centers": centers, "hist_normalized": norm}
             for c, v in zip(centers, norm):
                 all_rows.append(
                     {
@@ -150,17 +176,15 @@ def run(cfg: Dict[str, Any]) -> None:
                 )
 
             # Mouse-level summary statistics for this variable
-            vals = sub[var].to_numpy()
-            vals = vals[np.isfinite(vals)]
-            if vals.size > 0:
+            if "n" in rec:
                 mouse_averages_rows.append(
                     {
                         "variable": var,
                         "group": g,
                         "name": name,
-                        "mean": float(np.mean(vals)),
-                        "std": float(np.std(vals, ddof=1)) if vals.size > 1 else 0.0,
-                        "n": int(vals.size),
+                        "mean": rec["mean"],
+                        "std": rec["std"],
+                        "n": rec["n"],
                     }
                 )
 
@@ -187,3 +211,4 @@ def run(cfg: Dict[str, Any]) -> None:
         ma_out = Path(histogram_dir) / "group_mouse_averages_all.csv"
         ma_df.to_csv(ma_out, index=False)
         print(f"Wrote {ma_out}")
+
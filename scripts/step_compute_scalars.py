@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Tuple
 
 import pandas as pd
 
@@ -18,9 +18,18 @@ def _add_src_to_path() -> None:
 
 _add_src_to_path()
 
-from paper_analysis.io import load_pose_folder  # noqa: E402
-from paper_analysis.utils import ensure_dir  # noqa: E402
-from paper_analysis.features import compute_scalar_summary  # noqa: E402
+from paper_analysis.checkpoint import CheckpointDir, fingerprint  # noqa: E402
+from paper_analysis.io import iter_pose_folder, list_csvs  # noqa: E402
+from paper_analysis.utils import ensure_dir, resolve_path  # noqa: E402
+from paper_analysis.features import compute_scalar_summary, compute_skeleton_features, compute_window_features  # noqa: E402
+
+
+def artifacts(cfg: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+    paths = cfg.get("paths", {})
+    root = Path(__file__).resolve().parents[1]
+    pose_dir = resolve_path(paths.get("pose_dir", "data/pose_traj"), root)
+    results_dir = resolve_path(paths.get("results_dir", "results"), root)
+    return [str(pose_dir)], [str(results_dir / "scalar_summaries.csv")]
 
 
 def run(cfg: Dict[str, Any]) -> None:
@@ -60,21 +69,22 @@ def run(cfg: Dict[str, Any]) -> None:
     exclude_keypoints = params.get("exclude_keypoints", [])
     coord_suffixes = params.get("coord_suffixes", ["_x", "_y", "_z"])
     pose_has_header = params.get("pose_has_header", False)
+    prefetch = int(params.get("prefetch_sessions", 2))
+    window_cfg = params.get("window_features", {}) or {}
+    windows_s = list(window_cfg.get("windows_s", []) or [])
+    move_threshold = float(window_cfg.get("move_threshold", 2.0))
+    skeleton_cfg = params.get("skeleton_features", {}) or {}
+    skeleton_enabled = bool(skeleton_cfg.get("enabled", False))
 
     # Log effective settings for transparency
     print(f"[compute_scalars] pose_dir={pose_dir}")
     print(f"[compute_scalars] fps={fps}, smoothing_window={smoothing_window}, origin={origin}")
+    if skeleton_enabled:
+        print(f"[compute_scalars] skeleton_features: angle_triplets={skeleton_cfg.get('angle_triplets') or 'default'}")
+    if windows_s:
+        print(f"[compute_scalars] window_features: windows_s={windows_s}, move_threshold={move_threshold}")
 
-    dfs, names = load_pose_folder(
-        str(pose_dir),
-        labels=labels,
-        exclude_keypoints=exclude_keypoints,
-        coord_suffixes=coord_suffixes,
-        has_header=bool(pose_has_header),
-    )
-
-    rows: List[pd.DataFrame] = []
-    for df, name in zip(dfs, names):
+    def _session_scalars(df: pd.DataFrame, name: str) -> pd.DataFrame:
         scalars = compute_scalar_summary(
             df,
             fps=fps,
@@ -84,15 +94,110 @@ def run(cfg: Dict[str, Any]) -> None:
             length_criteria=length_criteria,
             height_criteria=height_criteria,
             velocity_criteria=velocity_criteria,
+            include_position=bool(windows_s),
         )
+        if windows_s:
+            windowed = compute_window_features(
+                scalars["velocity_xy"].to_numpy(),
+                scalars.pop("position_x").to_numpy(),
+                scalars.pop("position_y").to_numpy(),
+                fps=fps,
+                windows_s=windows_s,
+                move_threshold=move_threshold,
+            )
+            windowed.index = scalars.index
+            scalars = pd.concat([scalars, windowed], axis=1)
+        if skeleton_enabled:
+            skeleton = compute_skeleton_features(
+                df,
+                fps=fps,
+                smoothing_window=int(smoothing_window) if smoothing_window else None,
+                coord_suffixes=coord_suffixes,
+                angle_triplets=skeleton_cfg.get("angle_triplets"),
+                limbs=skeleton_cfg.get("limbs", ["RF", "LF", "RH", "LH"]),
+            )
+            scalars = pd.concat([scalars, skeleton], axis=1)
         scalars["name"] = name
-        rows.append(scalars)
+        return scalars
+
+    read_kwargs = dict(
+        labels=labels,
+        exclude_keypoints=exclude_keypoints,
+        coord_suffixes=coord_suffixes,
+        has_header=bool(pose_has_header),
+        prefetch=prefetch,
+    )
+    out_path = Path(results_dir) / "scalar_summaries.csv"
+    analysis = cfg.get("analysis", {})
+    resume = bool(analysis.get("resume", False))
+    if resume or analysis.get("checkpoint", False):
+        _run_checkpointed(pose_dir, out_path, params, read_kwargs, _session_scalars, resume=resume)
+        return
 
-    if not rows:
+    # Stream sessions: the next files load in the background while the current one is
+    # processed, and each result is appended to a temporary CSV instead of held in memory.
+    tmp_path = out_path.with_name(out_path.name + ".partial")
+    n_sessions = 0
+    try:
+        with open(tmp_path, "w", encoding="utf-8", newline="") as fh:
+            for df, name in iter_pose_folder(str(pose_dir), **read_kwargs):
+                scalars = _session_scalars(df, name)
+                scalars.to_csv(fh, index=False, header=n_sessions == 0)
+                n_sessions += 1
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    if n_sessions == 0:
+        tmp_path.unlink(missing_ok=True)
         print(f"No CSV files found in {pose_dir}.")
         return
 
-    out = pd.concat(rows, ignore_index=True)
-    out_path = Path(results_dir) / "scalar_summaries.csv"
-    out.to_csv(out_path, index=False)
-    print(f"Wrote {out_path}")
+    tmp_path.replace(out_path)
+    print(f"Wrote {out_path} ({n_sessions} sessions)")
+
+
+def _run_checkpointed(
+    pose_dir: Path,
+    out_path: Path,
+    params: Dict[str, Any],
+    read_kwargs: Dict[str, Any],
+    session_scalars: Callable[[pd.DataFrame, str], pd.DataFrame],
+    *,
+    resume: bool,
+) -> None:
+    # Each session's scalars go to <results_dir>/.work/compute_scalars/<name>.csv before
+    # the ledger records it; --resume recomputes only sessions that are missing or whose
+    # pose file changed, then assembles the same bytes a clean run writes. The parts and
+    # ledger stay until the whole pipeline finishes, so a resume after a later step
+    # failed leaves an up-to-date output untouched.
+    csvs = list_csvs(pose_dir)
+    if not csvs:
+        print(f"No CSV files found in {pose_dir}.")
+        return
+    ckpt = CheckpointDir(
+        out_path.parent / ".work" / "compute_scalars",
+        fingerprint({"parameters": params, "pose_dir": str(pose_dir)}),
+        resume=resume,
+    )
+    meta = {q.stem: {"size": q.stat().st_size, "mtime_ns": q.stat().st_mtime_ns} for q in csvs}
+    done = {name for name in meta if ckpt.is_done(name, ".csv", meta[name])}
+    print(f"[compute_scalars] checkpoint={ckpt.path} ({len(done)}/{len(meta)} sessions already done)")
+    sessions = {"sessions": [q.stem for q in csvs]}
+    if len(done) == len(meta) and ckpt.output_is_current(out_path, sessions):
+        print(f"[compute_scalars] {out_path} is up to date; nothing to do.")
+        return
+
+    for df, name in iter_pose_folder(str(pose_dir), skip=done, **read_kwargs):
+        data = session_scalars(df, name).to_csv(index=False).encode("utf-8")
+        ckpt.commit(name, ".csv", data, meta[name])
+
+    tmp_path = out_path.with_name(out_path.name + ".partial")
+    with open(tmp_path, "wb") as fh:
+        for i, q in enumerate(csvs):
+            data = ckpt.part_path(q.stem, ".csv").read_bytes()
+            # Keep the header of the first part only, as the streaming writer does
+            fh.write(data if i == 0 else data[data.find(b"\n") + 1 :])
+    tmp_path.replace(out_path)
+    ckpt.record_output(out_path, sessions)
+    print(f"Wrote {out_path} ({len(csvs)} sessions)")
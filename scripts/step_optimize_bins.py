@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 
 import numpy as np
 import pandas as pd
@@ -19,10 +19,16 @@ def _add_src_to_path() -> None:
 
 _add_src_to_path()
 
-from paper_analysis.utils import ensure_dir  # noqa: E402
+from paper_analysis.utils import ensure_dir, resolve_path  # noqa: E402
 from paper_analysis.features import freedman_diaconis_bins, scott_bins, sturges_bins  # noqa: E402
 
 
+def artifacts(cfg: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+    paths = cfg.get("paths", {})
+    results_dir = resolve_path(paths.get("results_dir", "results"), Path(__file__).resolve().parents[1])
+    return [str(results_dir / "scalar_summaries.csv")], [str(results_dir / "configs" / "histogram_bin_recommendations.csv")]
+
+
 def run(cfg: Dict[str, Any]) -> None:
     params = cfg.get("parameters", {})
     paths = cfg.get("paths", {})
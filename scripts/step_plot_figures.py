@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def _add_src_to_path() -> None:
+    import sys
+
+    this = Path(__file__).resolve()
+    root = this.parents[1]
+    src = root / "src"
+    if str(src) not in sys.path:
+        sys.path.insert(0, str(src))
+
+
+_add_src_to_path()
+
+from paper_analysis.utils import ensure_dir, resolve_path  # noqa: E402
+from paper_analysis.plotting import init_worker, minmax_decimate, render_figure  # noqa: E402
+
+
+def _io_paths(cfg: Dict[str, Any]) -> Tuple[Path, Path, Path]:
+    paths = cfg.get("paths", {})
+    root = Path(__file__).resolve().parents[1]
+    results_dir = resolve_path(paths.get("results_dir", "results"), root)
+    histogram_dir = resolve_path(paths.get("histogram_dir", results_dir / "scalar_histograms"), root)
+    figures_dir = resolve_path(paths.get("figures_dir", "results/figures"), root)
+    scalars_csv_cfg = paths.get("scalars_csv")
+    scalars_csv = resolve_path(scalars_csv_cfg, root) if scalars_csv_cfg else results_dir / "scalar_summaries.csv"
+    return histogram_dir, figures_dir, scalars_csv
+
+
+def artifacts(cfg: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+    histogram_dir, figures_dir, scalars_csv = _io_paths(cfg)
+    consumes = [str(histogram_dir)]
+    if cfg.get("parameters", {}).get("plot_traces", True):
+        consumes.append(str(scalars_csv))
+    return consumes, [str(figures_dir)]
+
+
+def _grid(n: int, max_cols: int = 3) -> Tuple[int, int]:
+    cols = max(min(n, max_cols), 1)
+    return int(np.ceil(n / cols)), cols
+
+
+def run(cfg: Dict[str, Any]) -> None:
+    params = cfg.get("parameters", {})
+    if not params.get("save_plots", False):
+        print("[plot_figures] Skipping: set parameters.save_plots to true to render figures.")
+        return
+
+    histogram_dir, figures_dir_path, scalars_csv = _io_paths(cfg)
+    group_mean_csv = histogram_dir / "group_mean_histogram.csv"
+    if not group_mean_csv.exists():
+        print(f"Histogram outputs not found: {group_mean_csv}")
+        return
+    figures_dir = ensure_dir(figures_dir_path)
+
+    fmt = str(params.get("figure_format", "png"))
+    dpi = int(params.get("figure_dpi", 100))
+    trace_points = int(params.get("trace_points", 2000))
+    fps = float(params.get("fps", 30))
+    n_workers = int(params.get("figure_jobs") or os.cpu_count() or 1)
+
+    group_mean = pd.read_csv(group_mean_csv)
+    variables: List[str] = list(params.get("variables", [])) or sorted(group_mean["variable"].unique().tolist())
+    per_var: Dict[str, pd.DataFrame] = {}
+    for var in variables:
+        p = histogram_dir / f"{var}_histogram_data.csv"
+        if p.exists():
+            per_var[var] = pd.read_csv(p)
+    variables = [v for v in variables if v in per_var]
+    if not variables:
+        print("No per-variable histogram files to plot.")
+        return
+
+    groups = sorted(group_mean["group"].unique().tolist())
+    colors = {g: f"C{i % 10}" for i, g in enumerate(groups)}
+    jobs: List[Dict[str, Any]] = []
+
+    # Per variable: group mean histograms
+    var_dir = ensure_dir(figures_dir / "variables")
+    for var in variables:
+        sub = group_mean[group_mean["variable"] == var]
+        lines = [
+            {"x": s["bin_center"].to_numpy(), "y": s["normalized_frequency"].to_numpy(), "color": colors[g], "linewidth": 2.0, "label": str(g), "drawstyle": "steps-mid"}
+            for g, s in sub.groupby("group")
+        ]
+        jobs.append(
+            {
+                "path": str(var_dir / f"{var}.{fmt}"),
+                "shape": (1, 1),
+                "dpi": dpi,
+                "panels": [{"title": var, "xlabel": var, "ylabel": "normalized frequency", "lines": lines}],
+            }
+        )
+
+    # Per group: every mouse (thin) with the group mean (thick), one panel per variable
+    group_dir = ensure_dir(figures_dir / "groups")
+    rows, cols = _grid(len(variables))
+    for g in groups:
+        panels = []
+        for var in variables:
+            df = per_var[var]
+            lines = [
+                {"x": s["bin_center"].to_numpy(), "y": s["normalized_frequency"].to_numpy(), "color": colors[g], "alpha": 0.3, "drawstyle": "steps-mid"}
+                for _, s in df[df["group"] == g].groupby("mouse")
+            ]
+            gm = group_mean[(group_mean["variable"] == var) & (group_mean["group"] == g)]
+            lines.append({"x": gm["bin_center"].to_numpy(), "y": gm["normalized_frequency"].to_numpy(), "color": "k", "linewidth": 2.0, "label": "group mean", "drawstyle": "steps-mid"})
+            panels.append({"title": var, "xlabel": var, "lines": lines})
+        jobs.append({"path": str(group_dir / f"{g}.{fmt}"), "shape": (rows, cols), "dpi": dpi, "suptitle": str(g), "panels": panels})
+
+    # Per mouse traces, reduced to a fixed-size min/max envelope before they reach a worker
+    traces: Dict[str, Dict[str, Tuple[np.ndarray, np.ndarray]]] = {}
+    if params.get("plot_traces", True) and scalars_csv.exists():
+        scalars = pd.read_csv(scalars_csv, usecols=lambda c: c == "name" or c in variables)
+        for name, sub in scalars.groupby("name"):
+            traces[str(name)] = {}
+            for var in variables:
+                if var in sub.columns:
+                    x, y = minmax_decimate(sub[var].to_numpy(), trace_points)
+                    traces[str(name)][var] = (x / fps, y)
+
+    # Per mouse: histogram of each variable, plus its trace over time when available
+    mouse_dir = ensure_dir(figures_dir / "mice")
+    mouse_groups: Dict[str, str] = {}
+    by_mouse: Dict[str, Dict[str, pd.DataFrame]] = {}
+    for var, df in per_var.items():
+        mouse_groups.update(dict(zip(df["mouse"].astype(str), df["group"].astype(str))))
+        by_mouse[var] = {str(m): s for m, s in df.groupby("mouse")}
+    for mouse, g in sorted(mouse_groups.items()):
+        hist_panels = []
+        trace_panels = []
+        for var in variables:
+            s = by_mouse[var].get(mouse, per_var[var].iloc[:0])
+            hist_panels.append(
+                {"title": var, "xlabel": var, "lines": [{"x": s["bin_center"].to_numpy(), "y": s["normalized_frequency"].to_numpy(), "color": colors.get(g, "C0"), "drawstyle": "steps-mid"}]}
+            )
+            if mouse in traces and var in traces[mouse]:
+                x, y = traces[mouse][var]
+                trace_panels.append({"title": var, "xlabel": "time (s)", "lines": [{"x": x, "y": y, "color": "0.3", "linewidth": 0.5}]})
+        n_rows = 2 if len(trace_panels) == len(variables) else 1
+        panels = hist_panels + (trace_panels if n_rows == 2 else [])
+        jobs.append({"path": str(mouse_dir / f"{mouse}.{fmt}"), "shape": (n_rows, len(variables)), "dpi": dpi, "suptitle": f"{mouse} ({g})", "panels": panels})
+
+    print(f"[plot_figures] figures_dir={figures_dir}")
+    print(f"[plot_figures] {len(jobs)} figures, workers={n_workers}")
+
+    if n_workers <= 1:
+        init_worker()
+        for job in jobs:
+            render_figure(job)
+    else:
+        chunksize = max(len(jobs) // (n_workers * 4), 1)
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=init_worker) as pool:
+            for _ in pool.map(render_figure, jobs, chunksize=chunksize):
+                pass
+    print(f"Wrote {len(jobs)} figures to {figures_dir}")
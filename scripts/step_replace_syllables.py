@@ -1,26 +1,46 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 
 import numpy as np
 import pandas as pd
 
 
-def run(cfg: Dict[str, Any]) -> None:
-    params = cfg.get("parameters", {})
-    ab = params.get("ablation", {})
+def _add_src_to_path() -> None:
+    import sys
+
+    this = Path(__file__).resolve()
+    root = this.parents[1]
+    src = root / "src"
+    if str(src) not in sys.path:
+        sys.path.insert(0, str(src))
+
+
+_add_src_to_path()
+
+from paper_analysis.moseq import load_moseq_store  # noqa: E402
+from paper_analysis.utils import resolve_path  # noqa: E402
+
+
+def _normalized_stem(stem: str) -> str:
+    if stem.endswith("_replace_syll") or stem.endswith("_replace_syll_"):
+        return stem[: stem.rfind("_replace_syll")]
+    return stem
+
+
+def ablation_paths(cfg: Dict[str, Any]) -> Tuple[Path, Path] | None:
+    """Resolve (input_csv, output_csv) for the ablation, or None if not configured."""
+    ab = cfg.get("parameters", {}).get("ablation", {})
 
     root = Path(__file__).resolve().parents[1]
 
     input_csv_cfg = ab.get("input_csv")
     output_csv_cfg = ab.get("output_csv")
     exclude_syllables: List[int] = list(ab.get("exclude_syllables", []))
-    random_seed = int(ab.get("random_seed", 42))
 
     if not input_csv_cfg or not output_csv_cfg:
-        print("[replace_syllables] Skipping: set parameters.ablation.input_csv and output_csv in config.")
-        return
+        return None
 
     input_csv = Path(input_csv_cfg)
     if not input_csv.is_absolute():
@@ -31,11 +51,6 @@ def run(cfg: Dict[str, Any]) -> None:
 
     # Build filename that reflects excluded syllables: *_replace_syll_[a,b].csv
     excl_str = ",".join(str(x) for x in sorted(exclude_syllables))
-    def _normalized_stem(stem: str) -> str:
-        if stem.endswith("_replace_syll") or stem.endswith("_replace_syll_"):
-            return stem[: stem.rfind("_replace_syll")]
-        return stem
-
     if out_cfg_path.suffix.lower() == ".csv":
         parent = out_cfg_path.parent
         base_stem = _normalized_stem(out_cfg_path.stem)
@@ -45,6 +60,29 @@ def run(cfg: Dict[str, Any]) -> None:
         parent = out_cfg_path
         base_stem = _normalized_stem(input_csv.stem)
         output_csv = parent / f"{base_stem}_replace_syll_[{excl_str}].csv"
+    return input_csv, output_csv
+
+
+def artifacts(cfg: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+    resolved = ablation_paths(cfg)
+    if resolved is None:
+        return [], []
+    input_csv, output_csv = resolved
+    return [str(input_csv)], [str(output_csv)]
+
+
+def run(cfg: Dict[str, Any]) -> None:
+    params = cfg.get("parameters", {})
+    ab = params.get("ablation", {})
+
+    exclude_syllables: List[int] = list(ab.get("exclude_syllables", []))
+    random_seed = int(ab.get("random_seed", 42))
+
+    resolved = ablation_paths(cfg)
+    if resolved is None:
+        print("[replace_syllables] Skipping: set parameters.ablation.input_csv and output_csv in config.")
+        return
+    input_csv, output_csv = resolved
 
     print(f"[replace_syllables] input={input_csv}")
     print(f"[replace_syllables] output={output_csv}")
@@ -56,23 +94,27 @@ def run(cfg: Dict[str, Any]) -> None:
         print(f"[replace_syllables] Input CSV not found: {input_csv}")
         return
 
-    df = pd.read_csv(input_csv)
-    if "syllable" not in df.columns:
+    # Indexed store: per-mouse selection is a slice lookup instead of an isin scan
+    cache_dir = cfg.get("paths", {}).get("cache_dir") or Path(cfg.get("paths", {}).get("results_dir", "results")) / "cache"
+    try:
+        store = load_moseq_store(input_csv, cache_dir=resolve_path(cache_dir, Path(__file__).resolve().parents[1]))
+    except ValueError:
         print(f"[replace_syllables] Input CSV has no 'syllable' column: {input_csv}")
         return
 
     out_rows = []
-    for name, sub in df.groupby("name"):
-        excluded = sub[sub["syllable"].isin(exclude_syllables)]
-        kept = sub[~sub["syllable"].isin(exclude_syllables)]
-        print(f"{name}: replacing {len(excluded)} excluded rows with resampled kept rows")
-        if kept.empty or len(excluded) == 0:
-            out_rows.append(sub)
+    for name in store.names:
+        n_excluded = store.count(name, exclude_syllables)
+        # File order within the mouse keeps resampling identical to the isin-based version
+        kept = store.rows(name, exclude_syllables=exclude_syllables, original_order=True)
+        print(f"{name}: replacing {n_excluded} excluded rows with resampled kept rows")
+        if kept.empty or n_excluded == 0:
+            out_rows.append(store.rows(name, original_order=True))
             continue
-        replacement = kept.sample(n=len(excluded), replace=True, random_state=random_seed)
+        replacement = kept.sample(n=n_excluded, replace=True, random_state=random_seed)
         out_rows.append(pd.concat([kept, replacement], ignore_index=True))
 
-    out_df = pd.concat(out_rows, ignore_index=True) if out_rows else df
+    out_df = pd.concat(out_rows, ignore_index=True) if out_rows else store.take(slice(None))
     output_csv.parent.mkdir(parents=True, exist_ok=True)
     out_df.to_csv(output_csv, index=False)
     print(f"Wrote {output_csv} (rows: {len(out_df)})")
@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def _add_src_to_path() -> None:
+    import sys
+
+    this = Path(__file__).resolve()
+    root = this.parents[1]
+    src = root / "src"
+    if str(src) not in sys.path:
+        sys.path.insert(0, str(src))
+
+
+_add_src_to_path()
+
+from paper_analysis.io import PoseCsvTail, list_csvs  # noqa: E402
+from paper_analysis.utils import ensure_dir, resolve_path  # noqa: E402
+from paper_analysis.features import OnlineScalarSummary, variable_bin_edges  # noqa: E402
+
+
+def _live_dir(cfg: Dict[str, Any]) -> Path:
+    paths = cfg.get("paths", {})
+    root = Path(__file__).resolve().parents[1]
+    results_dir = resolve_path(paths.get("results_dir", "results"), root)
+    return resolve_path(paths.get("live_dir") or results_dir / "live", root)
+
+
+def artifacts(cfg: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+    paths = cfg.get("paths", {})
+    pose_dir = resolve_path(paths.get("pose_dir", "data/pose_traj"), Path(__file__).resolve().parents[1])
+    return [str(pose_dir)], [str(_live_dir(cfg))]
+
+
+def _write_atomic(df: pd.DataFrame, path: Path) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    df.to_csv(tmp, index=False)
+    tmp.replace(path)
+
+
+class _LiveAggregates:
+    """Per-mouse histogram counts and running moments, updated in O(new rows)."""
+
+    def __init__(self, variables: List[str], params: Dict[str, Any], warmup_frames: int) -> None:
+        self.variables = variables
+        self.params = params
+        self.warmup_frames = warmup_frames
+        self.edges: Dict[str, np.ndarray] | None = None
+        self.counts: Dict[Tuple[str, str], np.ndarray] = {}
+        # (n, mean, M2) per (mouse, variable), merged with Chan et al.'s parallel update
+        self.moments: Dict[Tuple[str, str], Tuple[int, float, float]] = {}
+        self._warmup: List[pd.DataFrame] = []
+        self._warmup_rows = 0
+
+    def add(self, name: str, scalars: pd.DataFrame) -> None:
+        if scalars.empty:
+            return
+        for var in self.variables:
+            vals = scalars[var].to_numpy(dtype=float)
+            vals = vals[np.isfinite(vals)]
+            if vals.size == 0:
+                continue
+            n_b, mean_b = vals.size, float(vals.mean())
+            m2_b = float(((vals - mean_b) ** 2).sum())
+            n_a, mean_a, m2_a = self.moments.get((name, var), (0, 0.0, 0.0))
+            n = n_a + n_b
+            delta = mean_b - mean_a
+            self.moments[(name, var)] = (n, mean_a + delta * n_b / n, m2_a + m2_b + delta**2 * n_a * n_b / n)
+        if self.edges is None:
+            # Bin edges depend on the pooled distribution; buffer until there is enough of it
+            self._warmup.append(scalars.assign(name=name))
+            self._warmup_rows += len(scalars)
+            if self._warmup_rows >= self.warmup_frames:
+                self.freeze_edges()
+            return
+        self._count(name, scalars)
+
+    def freeze_edges(self) -> None:
+        if self.edges is not None or not self._warmup:
+            return
+        pooled = pd.concat(self._warmup, ignore_index=True)
+        self.edges = {
+            var: variable_bin_edges(
+                pooled[var].to_numpy(dtype=float),
+                var,
+                method=str(self.params.get("bin_method", "freedman_diaconis")).lower(),
+                manual_width_distance=float(self.params.get("manual_bin_width_distance_like", 1.0)),
+                manual_width_angle=float(self.params.get("manual_bin_width_angle_like", 0.5236)),
+                variable_bins=self.params.get("variable_bins", {}),
+            )
+            for var in self.variables
+        }
+        for name, sub in pooled.groupby("name", sort=False):
+            self._count(str(name), sub)
+        self._warmup = []
+
+    def _count(self, name: str, scalars: pd.DataFrame) -> None:
+        assert self.edges is not None
+        for var in self.variables:
+            vals = scalars[var].to_numpy(dtype=float)
+            hist, _ = np.histogram(vals[np.isfinite(vals)], bins=self.edges[var])
+            key = (name, var)
+            self.counts[key] = self.counts[key] + hist if key in self.counts else hist
+
+    def snapshot(self, histogram_dir: Path, groups: Dict[str, str]) -> None:
+        ma_rows = []
+        order = {var: i for i, var in enumerate(self.variables)}
+        for (name, var), (n, mean, m2) in sorted(self.moments.items(), key=lambda kv: (order[kv[0][1]], kv[0][0])):
+            if name in groups:
+                std = float(np.sqrt(m2 / (n - 1))) if n > 1 else 0.0
+                ma_rows.append({"variable": var, "group": groups[name], "name": name, "mean": mean, "std": std, "n": int(n)})
+        if ma_rows:
+            _write_atomic(pd.DataFrame(ma_rows), histogram_dir / "group_mouse_averages_all.csv")
+        if self.edges is None:
+            return
+
+        all_rows = []
+        for var in self.variables:
+            edges = self.edges[var]
+            centers = (edges[:-1] + edges[1:]) / 2
+            var_rows = []
+            for (name, v), hist in sorted(self.counts.items()):
+                if v != var or name not in groups:
+                    continue
+                norm = hist / max(hist.sum(), 1)
+                for c, f in zip(centers, norm):
+                    var_rows.append(
+                        {
+                            "variable": var,
+                            "group": groups[name],
+                            "mouse": name,
+                            "bin_center": float(c),
+                            "normalized_frequency": float(f),
+                        }
+                    )
+            _write_atomic(pd.DataFrame(var_rows), histogram_dir / f"{var}_histogram_data.csv")
+            all_rows.extend(var_rows)
+        if all_rows:
+            group_mean = (
+                pd.DataFrame(all_rows).groupby(["variable", "group", "bin_center"])["normalized_frequency"].mean().reset_index()
+            )
+            _write_atomic(group_mean, histogram_dir / "group_mean_histogram.csv")
+
+
+def run(cfg: Dict[str, Any]) -> None:
+    params = cfg.get("parameters", {})
+    paths = cfg.get("paths", {})
+    live = params.get("live", {}) or {}
+
+    root = Path(__file__).resolve().parents[1]
+    pose_dir = resolve_path(paths.get("pose_dir", "data/pose_traj"), root)
+    index_csv = resolve_path(paths.get("group_index_csv", "data/SIT/SIratio.csv"), root)
+    live_dir = ensure_dir(_live_dir(cfg))
+    histogram_dir = ensure_dir(live_dir / "scalar_histograms")
+
+    fps = int(params.get("fps", 30))
+    smoothing_window = params.get("smoothing_window", 5)
+    origin = tuple(params.get("origin", [0.0, 0.0]))  # type: ignore
+    scalar_kwargs = dict(
+        fps=fps,
+        origin=(float(origin[0]), float(origin[1])),
+        smoothing_window=int(smoothing_window) if smoothing_window else None,
+        centerpoint=tuple(params.get("centerpoint", ["head", "torso"])),
+        length_criteria=tuple(params.get("length_criteria", ["head", "anus"])),
+        height_criteria=tuple(params.get("height_criteria", ["head", "anus"])),
+        velocity_criteria=tuple(params.get("velocity_criteria", ["head", "torso"])),
+    )
+
+    labels = params.get("labels")
+    labels_file = params.get("labels_file")
+    if labels is None and labels_file:
+        lf = resolve_path(labels_file, root)
+        if lf.exists():
+            labels = [line.strip() for line in lf.read_text(encoding="utf-8").splitlines() if line.strip()]
+    read_kwargs = dict(
+        labels=labels,
+        exclude_keypoints=params.get("exclude_keypoints", []),
+        coord_suffixes=params.get("coord_suffixes", ["_x", "_y", "_z"]),
+        has_header=bool(params.get("pose_has_header", False)),
+    )
+
+    variables: List[str] = list(params.get("variables", []))
+    poll_interval = float(live.get("poll_interval_s", 5.0))
+    snapshot_interval = float(live.get("snapshot_interval_s", 60.0))
+    idle_timeout = live.get("idle_timeout_s")
+    aggregates = _LiveAggregates(variables, params, int(live.get("warmup_frames", 5000)))
+
+    print(f"[watch_scalars] pose_dir={pose_dir}")
+    print(f"[watch_scalars] live_dir={live_dir}")
+    print(f"[watch_scalars] poll={poll_interval}s, snapshot={snapshot_interval}s, idle_timeout={idle_timeout}")
+
+    tails: Dict[str, PoseCsvTail] = {}
+    states: Dict[str, OnlineScalarSummary] = {}
+    scalars_out = live_dir / "scalar_summaries.csv"
+    scalars_fh = open(scalars_out, "w", encoding="utf-8", newline="")
+    header_written = False
+
+    def _ingest(name: str, scalars: pd.DataFrame) -> None:
+        nonlocal header_written
+        if scalars.empty:
+            return
+        scalars = scalars.assign(name=name)
+        scalars.to_csv(scalars_fh, index=False, header=not header_written)
+        header_written = True
+        aggregates.add(name, scalars)
+
+    def _snapshot() -> None:
+        scalars_fh.flush()
+        groups: Dict[str, str] = {}
+        if index_csv.exists():
+            idx = pd.read_csv(index_csv)
+            groups = dict(zip(idx["name"].astype(str), idx["group"].astype(str)))
+        aggregates.snapshot(histogram_dir, groups)
+        n_frames = sum(s.n_rows for s in states.values())
+        print(f"[watch_scalars] snapshot: {len(states)} sessions, {n_frames} frames")
+
+    last_growth = last_snapshot = time.monotonic()
+    try:
+        while True:
+            for csv in list_csvs(pose_dir):
+                name = csv.stem
+                if name not in tails:
+                    tails[name] = PoseCsvTail(csv, **read_kwargs)
+                    states[name] = OnlineScalarSummary(**scalar_kwargs)
+                rows = tails[name].read_new()
+                if rows is not None and len(rows):
+                    last_growth = time.monotonic()
+                    _ingest(name, states[name].update(rows))
+            now = time.monotonic()
+            if now - last_snapshot >= snapshot_interval:
+                _snapshot()
+                last_snapshot = now
+            if idle_timeout is not None and now - last_growth >= float(idle_timeout):
+                print(f"[watch_scalars] No new rows for {idle_timeout}s; finishing.")
+                break
+            time.sleep(poll_interval)
+    except KeyboardInterrupt:
+        print("[watch_scalars] Interrupted; finishing.")
+    finally:
+        # Files are treated as complete: emit trailing frames whose window was truncated
+        for name, state in states.items():
+            _ingest(name, state.finalize())
+        aggregates.freeze_edges()
+        _snapshot()
+        scalars_fh.close()
+    print(f"Wrote {histogram_dir}")
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Dict, Mapping
+
+
+def fingerprint(obj: Any) -> str:
+    """Stable short hash of JSON-serializable settings."""
+
+    return hashlib.sha1(json.dumps(obj, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+
+def write_atomic(path: Path | str, data: str | bytes) -> None:
+    p = Path(path)
+    tmp = p.with_name(f"{p.name}.{os.getpid()}.tmp")
+    mode = "wb" if isinstance(data, bytes) else "w"
+    with open(tmp, mode, **({} if isinstance(data, bytes) else {"encoding": "utf-8", "newline": ""})) as fh:
+        fh.write(data)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp, p)
+
+
+def file_digest(path: Path | str, chunk_size: int = 1 << 20) -> str:
+    """Short content hash of a file, unaffected by rewrites that leave its bytes unchanged."""
+
+    h = hashlib.sha1()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()[:16]
+
+
+# Ledger key of the record describing a step's assembled final output
+_OUTPUT_KEY = "__output__"
+
+
+class CheckpointDir:
+    """Per-session partial outputs plus an append-only completion ledger.
+
+    ``ledger.jsonl`` starts with the run fingerprint, followed by one record per
+    completed session. A part file is written atomically before its ledger record,
+    so every recorded session has a complete part. Once the final output is assembled,
+    ``record_output`` notes its size and mtime, so a resumed run can tell the step is
+    already finished. With ``resume=False``, or when the fingerprint on disk differs
+    (settings changed), the directory starts empty.
+    """
+
+    def __init__(self, path: Path | str, run_fingerprint: str, *, resume: bool) -> None:
+        self.path = Path(path)
+        self.ledger_path = self.path / "ledger.jsonl"
+        self.fingerprint = run_fingerprint
+        self.records: Dict[str, Dict[str, Any]] = {}
+        if resume and self.ledger_path.exists():
+            self._load()
+        else:
+            self._reset()
+
+    def _reset(self) -> None:
+        if self.path.exists():
+            shutil.rmtree(self.path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        write_atomic(self.ledger_path, json.dumps({"fingerprint": self.fingerprint}) + "\n")
+        self.records = {}
+
+    def _load(self) -> None:
+        lines = self.ledger_path.read_text(encoding="utf-8").splitlines()
+        try:
+            head = json.loads(lines[0]) if lines else {}
+        except json.JSONDecodeError:
+            head = {}
+        if head.get("fingerprint") != self.fingerprint:
+            print(f"[checkpoint] Settings changed since {self.path} was written; starting over.")
+            self._reset()
+            return
+        for line in lines[1:]:
+            try:
+                rec = json.loads(line)
+            except json.JSONDecodeError:
+                # A torn final line from a crash mid-append; that session is redone
+                continue
+            self.records[rec["key"]] = rec
+
+    def part_path(self, key: str, suffix: str) -> Path:
+        return self.path / f"{key}{suffix}"
+
+    def is_done(self, key: str, suffix: str, meta: Mapping[str, Any] | None = None) -> bool:
+        rec = self.records.get(key)
+        if rec is None or not self.part_path(key, suffix).exists():
+            return False
+        return all(rec.get(k) == v for k, v in (meta or {}).items())
+
+    def commit(self, key: str, suffix: str, data: str | bytes, meta: Mapping[str, Any] | None = None) -> Path:
+        part = self.part_path(key, suffix)
+        write_atomic(part, data)
+        self._append(dict(meta or {}, key=key))
+        return part
+
+    def record_output(self, path: Path | str, meta: Mapping[str, Any] | None = None) -> None:
+        st = Path(path).stat()
+        self._append(dict(meta or {}, key=_OUTPUT_KEY, path=str(path), size=st.st_size, mtime_ns=st.st_mtime_ns))
+
+    def output_is_current(self, path: Path | str, meta: Mapping[str, Any] | None = None) -> bool:
+        """True if ``path`` is still the file written after the last ``record_output``."""
+
+        rec = self.records.get(_OUTPUT_KEY)
+        p = Path(path)
+        if rec is None or not p.exists():
+            return False
+        st = p.stat()
+        expected = dict(meta or {}, path=str(path), size=st.st_size, mtime_ns=st.st_mtime_ns)
+        return all(rec.get(k) == v for k, v in expected.items())
+
+    def _append(self, rec: Dict[str, Any]) -> None:
+        with open(self.ledger_path, "a", encoding="utf-8") as fh:
+            fh.write(json.dumps(rec) + "\n")
+            fh.flush()
+            os.fsync(fh.fileno())
+        self.records[rec["key"]] = rec
+
+    def cleanup(self) -> None:
+        shutil.rmtree(self.path, ignore_errors=True)
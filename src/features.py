@@ -6,6 +6,9 @@ import numpy as np
 import pandas as pd
 
 
+ANGLE_LIKE_VARIABLES = frozenset({"angle_to_origin", "torso_angle"})
+
+
 def compute_scalar_summary(
     df: pd.DataFrame,
     *,
@@ -16,11 +19,13 @@ def compute_scalar_summary(
     length_criteria: Sequence[str] = ("head", "anus"),
     height_criteria: Sequence[str] = ("head", "anus"),
     velocity_criteria: Sequence[str] = ("head", "torso"),
+    include_position: bool = False,
 ) -> pd.DataFrame:
     """Compute kinematic scalar features from keypoint trajectories.
 
     Returns a DataFrame with columns:
     distance_from_origin, velocity_xy, velocity_z, length, height, torso_angle, angle_to_origin
+    (plus position_x, position_y, the smoothed velocity_criteria midpoint, if include_position)
     """
 
     work = df.copy()
@@ -72,9 +77,283 @@ def compute_scalar_summary(
             "torso_angle": torso_angle,
         }
     )
+    if include_position:
+        out["position_x"] = vx
+        out["position_y"] = vy
+    return out
+
+
+def _window_bounds(n: int, window: int, session: np.ndarray | None) -> Tuple[np.ndarray, np.ndarray]:
+    # Centered like pandas rolling(center=True): rows [i - w//2, i + (w-1)//2], clipped to the session
+    idx = np.arange(n)
+    if session is None or n == 0:
+        s_start = np.zeros(n, dtype=np.int64)
+        s_end = np.full(n, n, dtype=np.int64)
+    else:
+        change = np.flatnonzero(session[1:] != session[:-1]) + 1
+        starts = np.r_[0, change]
+        ends = np.r_[change, n]
+        s_start = np.repeat(starts, ends - starts)
+        s_end = np.repeat(ends, ends - starts)
+    lo = np.maximum(idx - window // 2, s_start)
+    hi = np.minimum(idx + (window - 1) // 2 + 1, s_end)
+    return lo, hi
+
+
+def _window_sum(values: np.ndarray, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+    c = np.concatenate([[0.0], np.cumsum(values, dtype=float)])
+    return c[hi] - c[lo]
+
+
+def compute_window_features(
+    velocity: np.ndarray,
+    x: np.ndarray,
+    y: np.ndarray,
+    *,
+    fps: float,
+    windows_s: Sequence[float],
+    move_threshold: float,
+    session: np.ndarray | None = None,
+) -> pd.DataFrame:
+    """Sliding-window movement descriptors in O(frames) per window size.
+
+    Inputs are per-frame ``velocity_xy`` and position arrays, optionally for several
+    sessions concatenated with a contiguous ``session`` label per frame; windows never
+    cross a session boundary. Every windowed statistic is a difference of cumulative
+    sums, so cost does not depend on window length. NaN frames are ignored.
+
+    Columns per window (suffix ``_<w>s``): velocity_xy_mean, velocity_xy_var,
+    moving_fraction, bout_count (bout onsets in the window), distance_travelled and
+    tortuosity (path length / net displacement). ``bout_duration`` gives, for each
+    moving frame, the length in seconds of the bout containing it.
+    """
+
+    v = np.asarray(velocity, dtype=float)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = v.size
+    if session is not None:
+        session = np.asarray(session)
+    first = np.zeros(n, dtype=bool)
+    if n:
+        first[0] = True
+    if session is not None and n:
+        first[1:] = session[1:] != session[:-1]
+
+    finite = np.isfinite(v)
+    # Shift by the mean so the cumulative sum of squares does not lose precision
+    centered = np.where(finite, v - (v[finite].mean() if finite.any() else 0.0), 0.0)
+    moving = finite & (v > move_threshold)
+    onset = moving & (first | ~np.r_[False, moving[:-1]])
+
+    step = np.hypot(np.diff(x, prepend=np.nan), np.diff(y, prepend=np.nan))
+    step[first] = 0.0
+    step_ok = np.isfinite(step)
+    step = np.where(step_ok, step, 0.0)
+
+    # Run-length encode bouts: every moving frame gets the length of its bout
+    run_id = np.cumsum(onset)
+    run_len = np.bincount(run_id[moving], minlength=int(run_id.max(initial=0)) + 1)
+    bout_duration = np.where(moving, run_len[run_id] / fps, np.nan)
+
+    out: Dict[str, np.ndarray] = {}
+    for w_s in windows_s:
+        w = max(int(round(float(w_s) * fps)), 1)
+        tag = f"{float(w_s):g}s"
+        lo, hi = _window_bounds(n, w, session)
+        cnt = _window_sum(finite, lo, hi)
+        s1 = _window_sum(centered, lo, hi)
+        s2 = _window_sum(centered**2, lo, hi)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(cnt > 0, s1 / cnt, np.nan)
+            var = np.where(cnt > 1, (s2 - s1**2 / np.maximum(cnt, 1)) / (cnt - 1), np.nan)
+            out[f"velocity_xy_mean_{tag}"] = mean + (v[finite].mean() if finite.any() else 0.0)
+            out[f"velocity_xy_var_{tag}"] = np.maximum(var, 0.0)
+            out[f"moving_fraction_{tag}"] = np.where(cnt > 0, _window_sum(moving, lo, hi) / cnt, np.nan)
+            out[f"bout_count_{tag}"] = _window_sum(onset, lo, hi)
+            # Steps inside the window are those ending at frames lo+1 .. hi-1
+            path = _window_sum(step, np.minimum(lo + 1, hi), hi)
+            net = np.hypot(x[hi - 1] - x[lo], y[hi - 1] - y[lo]) if n else np.zeros(0)
+            out[f"distance_travelled_{tag}"] = path
+            out[f"tortuosity_{tag}"] = np.where(net > 0, path / net, np.nan)
+    out["bout_duration"] = bout_duration
+    return pd.DataFrame(out)
+
+
+def skeleton_keypoints(columns: Iterable[str], coord_suffixes: Sequence[str] = ("_x", "_y", "_z")) -> List[str]:
+    """Keypoint base names (in column order) that have a column for every suffix."""
+
+    cols = set(columns)
+    suf = coord_suffixes[0]
+    out: List[str] = []
+    for c in columns:
+        if c.endswith(suf):
+            base = c[: -len(suf)]
+            if base not in out and all(f"{base}{s}" in cols for s in coord_suffixes):
+                out.append(base)
     return out
 
 
+# Joint angles (a, b, c) at b between anatomically adjacent keypoints: the spine, and
+# each limb against the spine segment it attaches to
+DEFAULT_ANGLE_TRIPLETS: Tuple[Tuple[str, str, str], ...] = (
+    ("nose", "head", "torso"),
+    ("head", "torso", "anus"),
+    ("torso", "anus", "tail"),
+    ("head", "torso", "RF"),
+    ("head", "torso", "LF"),
+    ("RF", "torso", "LF"),
+    ("torso", "anus", "RH"),
+    ("torso", "anus", "LH"),
+    ("RH", "anus", "LH"),
+)
+
+
+def compute_skeleton_features(
+    df: pd.DataFrame,
+    *,
+    fps: int,
+    smoothing_window: int | None = None,
+    coord_suffixes: Sequence[str] = ("_x", "_y", "_z"),
+    keypoints: Sequence[str] | None = None,
+    angle_triplets: Sequence[Sequence[str]] | str | None = None,
+    limbs: Sequence[str] = ("RF", "LF", "RH", "LH"),
+    chunk_frames: int = 100_000,
+) -> pd.DataFrame:
+    """Geometric features over the whole skeleton, computed as batched array operations.
+
+    Keypoints are every base name with a column for each of ``coord_suffixes`` (so
+    keypoints dropped via ``exclude_keypoints`` are simply absent), unless given
+    explicitly. Coordinates are stacked into a ``(frames, keypoints, dims)`` array and
+    smoothed like ``compute_scalar_summary``. Returns columns:
+
+    - ``dist3d_<a>_<b>`` (when dims == 3) and ``dist2d_<a>_<b>`` for every keypoint pair
+    - ``angle_<a>_<b>_<c>``: angle at ``b`` between ``a`` and ``c`` for each of
+      ``angle_triplets`` (default ``DEFAULT_ANGLE_TRIPLETS``; ``"all"`` for every
+      triplet, which grows as n^3 and dominates the output size)
+    - ``speed_<limb>``: frame-to-frame speed of each limb keypoint present
+
+    Values are float32. Frames are processed in chunks of ``chunk_frames`` to bound
+    temporary memory.
+    """
+
+    kps = list(keypoints) if keypoints is not None else skeleton_keypoints(df.columns, coord_suffixes)
+    dims = len(coord_suffixes)
+    cols = [f"{k}{s}" for k in kps for s in coord_suffixes]
+    work = df[cols].astype(float)
+    if smoothing_window is not None and smoothing_window > 1:
+        work = work.rolling(window=int(smoothing_window), min_periods=1, center=True).mean()
+    pts = work.to_numpy().reshape(len(work), len(kps), dims)
+    n = pts.shape[0]
+    pos = {k: i for i, k in enumerate(kps)}
+
+    pair_i, pair_j = np.triu_indices(len(kps), k=1)
+    if angle_triplets is None:
+        angle_triplets = DEFAULT_ANGLE_TRIPLETS
+    if isinstance(angle_triplets, str):
+        if angle_triplets != "all":
+            raise ValueError(f"angle_triplets must be a list of [a, b, c] or 'all', got {angle_triplets!r}")
+        tri = [(a, b, c) for b in range(len(kps)) for a in range(len(kps)) for c in range(a + 1, len(kps)) if b not in (a, c)]
+    else:
+        tri = [(pos[a], pos[b], pos[c]) for a, b, c in angle_triplets if a in pos and b in pos and c in pos]
+    tri_arr = np.asarray(tri, dtype=np.int64).reshape(-1, 3)
+    limb_idx = [pos[k] for k in limbs if k in pos]
+
+    names: List[str] = []
+    if dims == 3:
+        names += [f"dist3d_{kps[i]}_{kps[j]}" for i, j in zip(pair_i, pair_j)]
+    names += [f"dist2d_{kps[i]}_{kps[j]}" for i, j in zip(pair_i, pair_j)]
+    names += [f"angle_{kps[a]}_{kps[b]}_{kps[c]}" for a, b, c in tri_arr]
+    names += [f"speed_{kps[i]}" for i in limb_idx]
+
+    n_pairs = len(pair_i)
+    # Column position of pair (i, j) in the squared-distance block, for either order
+    pair_pos = np.zeros((len(kps), len(kps)), dtype=np.int64)
+    pair_pos[pair_i, pair_j] = np.arange(n_pairs)
+    pair_pos[pair_j, pair_i] = np.arange(n_pairs)
+    ab = pair_pos[tri_arr[:, 0], tri_arr[:, 1]]
+    cb = pair_pos[tri_arr[:, 2], tri_arr[:, 1]]
+    ac = pair_pos[tri_arr[:, 0], tri_arr[:, 2]]
+
+    out = np.empty((n, len(names)), dtype=np.float32)
+    c2d = n_pairs if dims == 3 else 0
+    c_ang = c2d + n_pairs
+    c_spd = c_ang + len(tri_arr)
+    step = max(int(chunk_frames), 1)
+    for start in range(0, n, step):
+        stop = min(start + step, n)
+        p = pts[start:stop]
+        diff = p[:, pair_i, :] - p[:, pair_j, :]
+        sq2d = np.einsum("fpd,fpd->fp", diff[..., :2], diff[..., :2])
+        sq = sq2d + diff[..., 2] ** 2 if dims == 3 else sq2d
+        if dims == 3:
+            np.sqrt(sq, out=out[start:stop, :n_pairs])
+        np.sqrt(sq2d, out=out[start:stop, c2d:c_ang])
+        if len(tri_arr):
+            # Angle at b from the three pairwise distances: a.c = (|ab|^2 + |cb|^2 - |ac|^2) / 2,
+            # |a x c| = sqrt(|ab|^2 |cb|^2 - (a.c)^2); no per-triplet vector arithmetic needed
+            dab, dcb = sq[:, ab], sq[:, cb]
+            dot = (dab + dcb - sq[:, ac]) / 2
+            cross = np.sqrt(np.clip(dab * dcb - dot**2, 0.0, None))
+            np.arctan2(cross, dot, out=out[start:stop, c_ang:c_spd])
+        if limb_idx:
+            prev = pts[start - 1 : start, limb_idx, :] if start else np.full((1, len(limb_idx), dims), np.nan)
+            d = np.diff(p[:, limb_idx, :], axis=0, prepend=prev)
+            out[start:stop, c_spd:] = np.sqrt(np.einsum("fld,fld->fl", d, d)) * fps
+    return pd.DataFrame(out, columns=names, index=df.index)
+
+
+class OnlineScalarSummary:
+    """Incremental ``compute_scalar_summary`` for a pose stream that keeps growing.
+
+    Feed newly appended rows to ``update``; it returns the scalar rows that are now
+    final, i.e. whose centered smoothing window is complete. Only the few raw rows
+    needed as context for the next window and ``diff()`` are kept, so each update
+    costs O(new rows + smoothing_window). Call ``finalize`` once the stream ends to
+    emit the trailing rows; the concatenated output then matches the batch result.
+    Returned frames are indexed by absolute frame number.
+    """
+
+    def __init__(self, *, fps: int, smoothing_window: int | None = None, **kwargs) -> None:
+        self._kwargs = dict(kwargs, fps=fps, smoothing_window=smoothing_window)
+        w = int(smoothing_window) if smoothing_window is not None and smoothing_window > 1 else 1
+        # pandas centers even windows one row to the left: rows [i - w//2, i + (w-1)//2]
+        self._left = w // 2
+        self._right = (w - 1) // 2
+        self._buf: pd.DataFrame | None = None
+        self._buf_start = 0
+        self._n_rows = 0
+        self._emitted = 0
+
+    @property
+    def n_rows(self) -> int:
+        return self._n_rows
+
+    def update(self, rows: pd.DataFrame) -> pd.DataFrame:
+        if rows is not None and len(rows):
+            rows = rows.reset_index(drop=True)
+            self._buf = rows if self._buf is None else pd.concat([self._buf, rows], ignore_index=True)
+            self._n_rows += len(rows)
+        return self._emit(self._n_rows - self._right)
+
+    def finalize(self) -> pd.DataFrame:
+        return self._emit(self._n_rows)
+
+    def _emit(self, ready: int) -> pd.DataFrame:
+        if self._buf is None or ready <= self._emitted:
+            return pd.DataFrame()
+        out = compute_scalar_summary(self._buf, **self._kwargs)
+        result = out.iloc[self._emitted - self._buf_start : ready - self._buf_start].copy()
+        result.index = pd.RangeIndex(self._emitted, ready)
+        self._emitted = ready
+        # Keep context for the next row: its diff() needs the previous smoothed frame,
+        # whose window reaches back `left` more raw rows.
+        keep_from = max(ready - 1 - self._left, self._buf_start)
+        self._buf = self._buf.iloc[keep_from - self._buf_start :].reset_index(drop=True)
+        self._buf_start = keep_from
+        return result
+
+
 def freedman_diaconis_bins(arr: np.ndarray) -> int:
     data = arr[np.isfinite(arr)]
     if data.size < 2:
@@ -107,3 +386,63 @@ def scott_bins(arr: np.ndarray) -> int:
         return 10
     n_bins = int(np.ceil((data.max() - data.min()) / h))
     return max(n_bins, 1)
+
+
+def compute_bin_edges(values: np.ndarray, method: str, manual_width: float | None = None) -> np.ndarray:
+    data = values[np.isfinite(values)]
+    if data.size == 0:
+        return np.array([0.0, 1.0])
+    x_min = np.percentile(data, 1)
+    x_max = np.percentile(data, 99)
+    if method == "sturges":
+        n = int(np.ceil(np.log2(max(data.size, 1))) + 1)
+    elif method == "scott":
+        sigma = np.std(data)
+        if sigma == 0:
+            n = 10
+        else:
+            h = 3.5 * sigma * (data.size ** (-1 / 3))
+            n = int(np.ceil((x_max - x_min) / max(h, 1e-6)))
+    elif method == "freedman_diaconis":
+        q75, q25 = np.percentile(data, [75, 25])
+        iqr = q75 - q25
+        if iqr == 0:
+            n = 10
+        else:
+            h = 2 * iqr * (data.size ** (-1 / 3))
+            n = int(np.ceil((x_max - x_min) / max(h, 1e-6)))
+    elif method == "manual" and manual_width:
+        n = int(np.ceil((x_max - x_min) / manual_width))
+    else:
+        n = 10
+    n = max(n, 1)
+    return np.linspace(x_min, x_max, n + 1)
+
+
+def variable_bin_edges(
+    values: np.ndarray,
+    variable: str,
+    *,
+    method: str,
+    manual_width_distance: float,
+    manual_width_angle: float,
+    variable_bins: Mapping[str, object] | None = None,
+) -> np.ndarray:
+    """Histogram edges for one variable, honoring per-variable overrides.
+
+    An integer override gives that many bins across the 1st–99th percentile; a list is
+    used as explicit edges. Otherwise ``method`` is applied via ``compute_bin_edges``.
+    """
+
+    width = manual_width_angle if variable in ANGLE_LIKE_VARIABLES else manual_width_distance
+    vb = (variable_bins or {}).get(variable)
+    if isinstance(vb, int) and vb > 0:
+        data = values[np.isfinite(values)]
+        if data.size == 0:
+            return np.array([0.0, 1.0])
+        x_min = np.percentile(data, 1)
+        x_max = np.percentile(data, 99)
+        return np.linspace(x_min, x_max, int(vb) + 1)
+    if isinstance(vb, (list, tuple, np.ndarray)) and len(vb) >= 2:
+        return np.asarray(vb, dtype=float)
+    return compute_bin_edges(values, method, manual_width=width)
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import io
 import os
+import queue
+import threading
 from pathlib import Path
-from typing import List, Sequence, Tuple
+from typing import Iterable, Iterator, List, Sequence, Tuple
 
 import pandas as pd
 
@@ -82,3 +85,124 @@ def load_pose_folder(
         )
         names.append(os.path.splitext(csv.name)[0])
     return dataframes, names
+
+
+def iter_pose_folder(
+    folder: Path | str,
+    *,
+    labels: Sequence[str] | None = None,
+    exclude_keypoints: Sequence[str] | None = None,
+    coord_suffixes: Sequence[str] = ("_x", "_y", "_z"),
+    has_header: bool | None = None,
+    prefetch: int = 2,
+    skip: Iterable[str] = (),
+) -> Iterator[Tuple[pd.DataFrame, str]]:
+    """Yield (DataFrame, name) per CSV in ``folder``, in the order of ``load_pose_folder``.
+
+    A background thread reads up to ``prefetch`` files ahead of the consumer, so disk
+    reads overlap with whatever the caller does with each session. A file is read only
+    once one of the ``prefetch`` slots is free, so at most ``prefetch + 1`` sessions
+    (the queued ones plus the one the caller holds) are in memory. ``prefetch=0``
+    reads synchronously. Sessions whose name is in ``skip`` are not read.
+    """
+
+    skipped = set(skip)
+    csvs = [q for q in list_csvs(folder) if os.path.splitext(q.name)[0] not in skipped]
+
+    def _read(csv: Path) -> pd.DataFrame:
+        return read_pose_csv(
+            csv,
+            labels=labels,
+            exclude_keypoints=exclude_keypoints,
+            coord_suffixes=coord_suffixes,
+            has_header=has_header,
+        )
+
+    if prefetch <= 0:
+        for csv in csvs:
+            yield _read(csv), os.path.splitext(csv.name)[0]
+        return
+
+    done = object()
+    buf: queue.Queue = queue.Queue()
+    # A slot is taken before a file is read and returned once the consumer takes it, so
+    # the reader never holds a session beyond the ``prefetch`` queued ones
+    slots = threading.Semaphore(int(prefetch))
+    stop = threading.Event()
+
+    def _reserve() -> bool:
+        while not stop.is_set():
+            if slots.acquire(timeout=0.1):
+                return True
+        return False
+
+    def _producer() -> None:
+        try:
+            for csv in csvs:
+                if not _reserve():
+                    return
+                buf.put((_read(csv), os.path.splitext(csv.name)[0]))
+        except BaseException as e:  # surface read errors in the consumer
+            buf.put(e)
+            return
+        buf.put(done)
+
+    worker = threading.Thread(target=_producer, name="pose-prefetch", daemon=True)
+    worker.start()
+    try:
+        while True:
+            item = buf.get()
+            slots.release()
+            if item is done:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item  # type: ignore[misc]
+    finally:
+        stop.set()
+        worker.join()
+
+
+class PoseCsvTail:
+    """Read rows appended to a pose CSV since the previous call.
+
+    Only complete lines are consumed; a partially written last line is left for the
+    next ``read_new``. Header/label handling matches ``read_pose_csv``.
+    """
+
+    def __init__(
+        self,
+        path: Path | str,
+        *,
+        labels: Sequence[str] | None = None,
+        exclude_keypoints: Sequence[str] | None = None,
+        coord_suffixes: Sequence[str] = ("_x", "_y", "_z"),
+        has_header: bool | None = None,
+    ) -> None:
+        self.path = Path(path)
+        self.labels = labels
+        self.exclude_keypoints = exclude_keypoints
+        self.coord_suffixes = coord_suffixes
+        # Same default as read_pose_csv: header row unless labels are provided
+        self._expect_header = (labels is None) if has_header is None else bool(has_header)
+        self._header: List[str] | None = None
+        self._offset = 0
+
+    def read_new(self) -> pd.DataFrame | None:
+        with open(self.path, "rb") as fh:
+            fh.seek(self._offset)
+            chunk = fh.read()
+        end = chunk.rfind(b"\n")
+        if end < 0:
+            return None
+        data = chunk[: end + 1]
+        self._offset += end + 1
+        if self._expect_header and self._header is None:
+            first, _, data = data.partition(b"\n")
+            self._header = [str(c) for c in pd.read_csv(io.BytesIO(first + b"\n"), nrows=0).columns]
+        if not data.strip():
+            return None
+        df = pd.read_csv(io.BytesIO(data), header=None, names=self._header)
+        df = _apply_labels(df, self.labels)
+        df = _exclude_keypoints(df, self.exclude_keypoints, self.coord_suffixes)
+        return df
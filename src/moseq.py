@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class MoseqStore:
+    """Per-syllable MoSeq table with precomputed (name, syllable) and group indexes.
+
+    Rows are stored sorted by ``(name, syllable)`` (stable, so file order is kept
+    within each key). Offset arrays give every mouse and every (mouse, syllable) pair
+    a contiguous slice, so selecting a mouse costs one dictionary lookup and excluding
+    syllables costs one slice boundary per excluded syllable instead of an ``isin``
+    scan over the whole table. Each mouse's rows in file order are also precomputed,
+    so ``select(..., original_order=True)`` is a slice of that order plus, with
+    exclusions, one O(rows of that mouse) mask instead of a sort.
+    """
+
+    def __init__(self, df: pd.DataFrame) -> None:
+        if "name" not in df.columns or "syllable" not in df.columns:
+            raise ValueError("MoSeq table needs 'name' and 'syllable' columns")
+        order = np.lexsort((df["syllable"].to_numpy(), df["name"].to_numpy()))
+        self.frame = df.iloc[order].reset_index(drop=True)
+        # Original file row of each stored row, to restore file order on request
+        self.row_ids = order.astype(np.int64)
+
+        names = self.frame["name"].to_numpy()
+        sylls = self.frame["syllable"].to_numpy()
+        key_change = np.flatnonzero((names[1:] != names[:-1]) | (sylls[1:] != sylls[:-1])) + 1
+        key_starts = np.r_[0, key_change] if len(self.frame) else np.array([], dtype=np.int64)
+        self.key_offsets = np.r_[key_starts, len(self.frame)].astype(np.int64)
+        self.key_names = names[key_starts]
+        self.key_syllables = sylls[key_starts]
+
+        name_change = np.flatnonzero(self.key_names[1:] != self.key_names[:-1]) + 1
+        name_key_starts = np.r_[0, name_change] if len(key_starts) else np.array([], dtype=np.int64)
+        self.names = self.key_names[name_key_starts]
+        # Mouse i owns keys [name_key_offsets[i], name_key_offsets[i+1])
+        self.name_key_offsets = np.r_[name_key_starts, len(key_starts)].astype(np.int64)
+        self._name_pos: Dict[object, int] = {n: i for i, n in enumerate(self.names)}
+        # Stored positions grouped by mouse (same blocks as mouse_slice), in file order within each
+        row_offsets = self.key_offsets[self.name_key_offsets]
+        mouse_of_row = np.repeat(np.arange(len(self.names)), np.diff(row_offsets))
+        self.file_order = np.lexsort((self.row_ids, mouse_of_row)).astype(np.int64)
+
+        self._groups: Dict[object, List[object]] = {}
+        if "group" in self.frame.columns:
+            first_rows = self.key_offsets[self.name_key_offsets[:-1]]
+            for n, g in zip(self.names, self.frame["group"].to_numpy()[first_rows]):
+                self._groups.setdefault(g, []).append(n)
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    @property
+    def groups(self) -> List[object]:
+        return list(self._groups)
+
+    def group_names(self, group: object) -> List[object]:
+        return list(self._groups.get(group, []))
+
+    def mouse_slice(self, name: object) -> slice:
+        i = self._name_pos.get(name)
+        if i is None:
+            return slice(0, 0)
+        k0, k1 = self.name_key_offsets[i], self.name_key_offsets[i + 1]
+        return slice(int(self.key_offsets[k0]), int(self.key_offsets[k1]))
+
+    def _syllable_slices(self, name: object, syllables: Iterable[object]) -> List[slice]:
+        i = self._name_pos.get(name)
+        if i is None:
+            return []
+        k0, k1 = self.name_key_offsets[i], self.name_key_offsets[i + 1]
+        keys = self.key_syllables[k0:k1]
+        out = []
+        for s in sorted(set(syllables)):
+            k = int(np.searchsorted(keys, s))
+            if k < len(keys) and keys[k] == s:
+                out.append(slice(int(self.key_offsets[k0 + k]), int(self.key_offsets[k0 + k + 1])))
+        return out
+
+    def syllable_slice(self, name: object, syllable: object) -> slice:
+        found = self._syllable_slices(name, [syllable])
+        return found[0] if found else slice(0, 0)
+
+    def count(self, name: object, syllables: Iterable[object] | None = None) -> int:
+        if syllables is None:
+            sl = self.mouse_slice(name)
+            return sl.stop - sl.start
+        return sum(sl.stop - sl.start for sl in self._syllable_slices(name, syllables))
+
+    def select(
+        self,
+        name: object,
+        *,
+        exclude_syllables: Iterable[object] = (),
+        original_order: bool = False,
+    ) -> np.ndarray:
+        """Stored row positions of ``name`` without ``exclude_syllables``.
+
+        With ``original_order=True`` the positions follow the order of the source file.
+        """
+
+        block = self.mouse_slice(name)
+        excluded = self._syllable_slices(name, exclude_syllables)
+        if original_order:
+            pos = self.file_order[block]
+            if not excluded:
+                return pos
+            keep = np.ones(block.stop - block.start, dtype=bool)
+            for sl in excluded:
+                keep[sl.start - block.start : sl.stop - block.start] = False
+            return pos[keep[pos - block.start]]
+        bounds = [block.start]
+        for sl in excluded:
+            bounds.extend([sl.start, sl.stop])
+        bounds.append(block.stop)
+        return np.concatenate([np.arange(a, b) for a, b in zip(bounds[::2], bounds[1::2])] or [np.array([], dtype=np.int64)])
+
+    def rows(self, name: object, *, exclude_syllables: Iterable[object] = (), original_order: bool = False) -> pd.DataFrame:
+        return self.take(self.select(name, exclude_syllables=exclude_syllables, original_order=original_order))
+
+    def take(self, positions: np.ndarray | slice) -> pd.DataFrame:
+        return self.frame.iloc[positions].reset_index(drop=True)
+
+
+_STORE_CACHE: Dict[Tuple[str, int, int], MoseqStore] = {}
+# Bump when MoseqStore's pickled layout changes so older cache files are not loaded
+_STORE_VERSION = 2
+
+
+def load_moseq_store(path: Path | str, *, cache_dir: Path | str | None = None) -> MoseqStore:
+    """Load a MoSeq CSV as a ``MoseqStore``, converting it at most once per file version.
+
+    Stores are cached in memory for the life of the process and, if ``cache_dir`` is
+    given, pickled there. Cache entries are keyed on the file path, size and mtime,
+    so they are rebuilt whenever the CSV changes; writing a new entry removes the
+    older ones for the same CSV.
+    """
+
+    p = Path(path).resolve()
+    st = p.stat()
+    key = (str(p), st.st_size, st.st_mtime_ns)
+    store = _STORE_CACHE.get(key)
+    if store is not None:
+        return store
+
+    cache_file = None
+    if cache_dir is not None:
+        # <stem>.<path hash>.<version hash>: entries for one CSV share a prefix, and a
+        # CSV with the same stem in another folder never collides with them
+        path_digest = hashlib.sha1(str(p).encode("utf-8")).hexdigest()[:8]
+        digest = hashlib.sha1(repr((key, _STORE_VERSION)).encode("utf-8")).hexdigest()[:16]
+        cache_file = Path(cache_dir) / f"{p.stem}.{path_digest}.{digest}.moseqstore.pkl"
+        if cache_file.exists():
+            with open(cache_file, "rb") as fh:
+                store = pickle.load(fh)
+
+    if store is None:
+        store = MoseqStore(pd.read_csv(p))
+        if cache_file is not None:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+            with open(tmp, "wb") as fh:
+                pickle.dump(store, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            tmp.replace(cache_file)
+            for stale in cache_file.parent.glob(f"{p.stem}.{path_digest}.*.moseqstore.pkl"):
+                if stale != cache_file:
+                    stale.unlink(missing_ok=True)
+
+    _STORE_CACHE[key] = store
+    return store
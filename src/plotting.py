@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+
+def minmax_decimate(y: np.ndarray, n_buckets: int = 2000) -> Tuple[np.ndarray, np.ndarray]:
+    """Reduce a long trace to a min/max envelope of ``n_buckets`` buckets.
+
+    Returns ``(x, y)`` with two points per bucket (its min and max), where ``x`` is the
+    frame index of the bucket start. Peaks survive, and the cost of drawing the result
+    no longer depends on the number of frames.
+    """
+
+    y = np.asarray(y, dtype=float)
+    n = y.size
+    if n <= 2 * n_buckets:
+        return np.arange(n, dtype=float), y
+    size = int(np.ceil(n / n_buckets))
+    padded = np.full(size * int(np.ceil(n / size)), np.nan)
+    padded[:n] = y
+    blocks = padded.reshape(-1, size)
+    finite = np.isfinite(blocks).any(axis=1)
+    lo = np.full(blocks.shape[0], np.nan)
+    hi = np.full(blocks.shape[0], np.nan)
+    lo[finite] = np.nanmin(blocks[finite], axis=1)
+    hi[finite] = np.nanmax(blocks[finite], axis=1)
+    x = np.repeat(np.arange(blocks.shape[0], dtype=float) * size, 2)
+    return x, np.column_stack([lo, hi]).ravel()
+
+
+# Per-process figure templates keyed by (rows, cols, figsize), reused across jobs
+_TEMPLATES: Dict[Tuple[int, int, Tuple[float, float]], Any] = {}
+
+
+def init_worker() -> None:
+    import matplotlib
+
+    matplotlib.use("Agg")
+
+
+def _template(rows: int, cols: int, figsize: Tuple[float, float]):
+    key = (rows, cols, figsize)
+    tpl = _TEMPLATES.get(key)
+    if tpl is None:
+        import matplotlib.pyplot as plt
+
+        fig, axes = plt.subplots(rows, cols, figsize=figsize, squeeze=False)
+        tpl = (fig, axes, {})
+        _TEMPLATES[key] = tpl
+    return tpl
+
+
+def _line_pool(ax, pools: Dict[Any, Any], n: int) -> List[Any]:
+    pool = pools.setdefault(id(ax), [])
+    while len(pool) < n:
+        (line,) = ax.plot([], [])
+        pool.append(line)
+    for line in pool[n:]:
+        line.set_visible(False)
+        line.set_label("_nolegend_")
+    return pool[:n]
+
+
+def render_figure(job: Mapping[str, Any]) -> str:
+    """Draw one figure from a plain-data spec and save it to ``job["path"]``.
+
+    ``job`` holds ``shape`` (rows, cols), optional ``figsize``, ``dpi`` and
+    ``suptitle``, and ``panels``: one dict per axes with ``title``, ``xlabel``,
+    ``ylabel`` and ``lines`` (dicts with ``x``, ``y`` and optional ``color``,
+    ``linewidth``, ``alpha``, ``label``, ``drawstyle``). Figures and line artists are
+    reused between calls with the same layout instead of being rebuilt.
+    """
+
+    rows, cols = job["shape"]
+    figsize = tuple(job.get("figsize", (4.0 * cols, 3.0 * rows)))
+    fig, axes, pools = _template(rows, cols, figsize)
+    panels: Sequence[Mapping[str, Any]] = job["panels"]
+    for i, ax in enumerate(axes.ravel()):
+        panel = panels[i] if i < len(panels) else None
+        ax.set_visible(panel is not None)
+        if panel is None:
+            continue
+        specs = panel.get("lines", [])
+        for line, spec in zip(_line_pool(ax, pools, len(specs)), specs):
+            line.set_data(spec["x"], spec["y"])
+            line.set_visible(True)
+            line.set_color(spec.get("color", "C0"))
+            line.set_linewidth(spec.get("linewidth", 1.0))
+            line.set_alpha(spec.get("alpha", 1.0))
+            line.set_drawstyle(spec.get("drawstyle", "default"))
+            line.set_label(spec.get("label", "_nolegend_"))
+        ax.set_title(panel.get("title", ""), fontsize=9)
+        ax.set_xlabel(panel.get("xlabel", ""), fontsize=8)
+        ax.set_ylabel(panel.get("ylabel", ""), fontsize=8)
+        ax.relim(visible_only=True)
+        ax.autoscale_view()
+        legend = ax.get_legend()
+        if legend is not None:
+            legend.remove()
+        if any(not str(s.get("label", "_")).startswith("_") for s in specs):
+            ax.legend(fontsize=7, frameon=False)
+    fig.suptitle(job.get("suptitle", ""))
+    if not pools.get("laid_out"):
+        # Layout is computed once per template; later jobs share the same geometry
+        fig.tight_layout()
+        pools["laid_out"] = True
+    fig.savefig(job["path"], dpi=job.get("dpi", 100))
+    return str(job["path"])
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import contextlib
+import sys
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from importlib import import_module
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Dict, List, Mapping, Sequence, Set, Tuple
+
+
+def import_step(step: str) -> Tuple[ModuleType | None, List[str]]:
+    errors: List[str] = []
+    for mod_name in (f"scripts.step_{step}", f"step_{step}"):
+        try:
+            return import_module(mod_name), errors
+        except ModuleNotFoundError as e:
+            errors.append(str(e))
+    return None, errors
+
+
+def build_dag(nodes: Sequence[Mapping[str, Any]]) -> Dict[str, Set[str]]:
+    """Derive node dependencies from the artifacts each node consumes and produces.
+
+    Edges preserve the semantics of running ``nodes`` in list order: a node waits for
+    the last earlier writer of anything it reads or writes, and for earlier readers of
+    anything it overwrites. Nodes with ``barrier=True`` (steps that declare no
+    artifacts) wait for every earlier node and block every later one.
+    """
+
+    deps: Dict[str, Set[str]] = {}
+    writer: Dict[str, str] = {}
+    readers: Dict[str, Set[str]] = {}
+    seen: List[str] = []
+    last_barrier: str | None = None
+    for node in nodes:
+        nid = node["id"]
+        if node.get("barrier"):
+            d = set(seen)
+            last_barrier = nid
+        else:
+            d = {last_barrier} if last_barrier else set()
+            for a in node.get("consumes", ()):
+                if a in writer:
+                    d.add(writer[a])
+            for a in node.get("produces", ()):
+                if a in writer:
+                    d.add(writer[a])
+                d.update(readers.get(a, set()))
+        d.discard(nid)
+        deps[nid] = d
+        for a in node.get("consumes", ()):
+            readers.setdefault(a, set()).add(nid)
+        for a in node.get("produces", ()):
+            writer[a] = nid
+            readers[a] = set()
+        seen.append(nid)
+    return deps
+
+
+def _run_node(step: str, cfg: Dict[str, Any], log_path: str, search_path: Sequence[str]) -> float:
+    for p in reversed(list(search_path)):
+        if p not in sys.path:
+            sys.path.insert(0, p)
+    start = time.perf_counter()
+    with open(log_path, "w", encoding="utf-8") as log, contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        mod, errors = import_step(step)
+        if mod is None:
+            raise RuntimeError(f"Could not import step '{step}': {errors}")
+        try:
+            mod.run(cfg)
+        except Exception:
+            traceback.print_exc()
+            raise
+    return time.perf_counter() - start
+
+
+def run_dag(
+    nodes: Sequence[Mapping[str, Any]],
+    deps: Mapping[str, Set[str]],
+    *,
+    jobs: int,
+    log_dir: Path | str,
+) -> None:
+    """Run nodes in worker processes as soon as their dependencies finish.
+
+    At most ``jobs`` nodes run at once. Each node's stdout/stderr goes to
+    ``<log_dir>/<node id>.log``. On the first failure no further nodes are started;
+    nodes already running are allowed to finish, then a RuntimeError is raised.
+    """
+
+    log_dir = Path(log_dir)
+    log_dir.mkdir(parents=True, exist_ok=True)
+    by_id = {n["id"]: n for n in nodes}
+    order = [n["id"] for n in nodes]
+    done: Set[str] = set()
+    submitted: Set[str] = set()
+    running: Dict[Future, str] = {}
+    failed: List[str] = []
+
+    with ProcessPoolExecutor(max_workers=max(int(jobs), 1)) as pool:
+        while True:
+            if not failed:
+                for nid in order:
+                    if nid in submitted or not deps.get(nid, set()) <= done:
+                        continue
+                    if len(running) >= jobs:
+                        break
+                    node = by_id[nid]
+                    log_path = log_dir / f"{nid.replace('@', '_')}.log"
+                    fut = pool.submit(_run_node, node["step"], node["cfg"], str(log_path), list(sys.path))
+                    running[fut] = nid
+                    submitted.add(nid)
+                    print(f"==> Started step: {nid} (log: {log_path})")
+            if not running:
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                nid = running.pop(fut)
+                try:
+                    elapsed = fut.result()
+                except Exception as e:
+                    failed.append(nid)
+                    print(f"[FAILED] {nid}: {e!r} (see {log_dir / (nid.replace('@', '_') + '.log')})")
+                else:
+                    done.add(nid)
+                    print(f"==> Finished step: {nid} ({elapsed:.1f}s)")
+
+    if failed:
+        skipped = [nid for nid in order if nid not in submitted]
+        if skipped:
+            print(f"[WARN] Not run due to failure: {skipped}")
+        raise RuntimeError(f"Pipeline failed in step(s): {failed}")
@@ -30,3 +30,10 @@ def load_yaml(path: Path | str) -> Dict[str, Any]:
     with open(path, "r", encoding="utf-8") as f:
         return yaml.safe_load(f)
 
+
+
+def resolve_path(path: Path | str, root: Path) -> Path:
+    p = Path(path)
+    if not p.is_absolute():
+        p = (root / p).resolve()
+    return p